@@ -0,0 +1,104 @@
+"""
+Caching helpers - On-disk result cache
+"""
+import hashlib
+import os
+import tempfile
+import threading
+
+try:
+    # Optional: without diskcache every call simply goes to the API
+    import diskcache
+except ImportError:
+    diskcache = None
+
+CACHE_DIR = os.path.join(tempfile.gettempdir(), 'deepfake_cache')
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Get the shared on-disk cache
+
+    Returns:
+        diskcache.Cache or None: Cache instance, or None if diskcache is unavailable
+    """
+    global _cache
+
+    if diskcache is None:
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = diskcache.Cache(CACHE_DIR)
+
+    return _cache
+
+
+def make_key(*parts):
+    """
+    Build a cache key from strings and bytes
+
+    Args:
+        *parts: str or bytes values (e.g. model name, prompt, image bytes)
+
+    Returns:
+        str: blake2b hex digest of the parts
+    """
+    digest = hashlib.blake2b()
+
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode('utf-8')
+        digest.update(part)
+        digest.update(b'\0')
+
+    return digest.hexdigest()
+
+
+def file_digest(file_path, chunk_size=1024 * 1024):
+    """
+    Hash a file's contents without loading it into memory at once
+
+    Args:
+        file_path: Path to the file
+        chunk_size: Bytes read per iteration
+
+    Returns:
+        str: sha256 hex digest of the file
+    """
+    digest = hashlib.sha256()
+
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def cached(key, compute):
+    """
+    Return the cached value for key, computing and storing it on a miss
+
+    Args:
+        key: Cache key (see make_key)
+        compute: Zero-argument callable producing the value
+
+    Returns:
+        The cached or freshly computed value (empty results are not stored)
+    """
+    cache = get_cache()
+
+    if cache is None:
+        return compute()
+
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        if value:
+            cache.set(key, value)
+
+    return value
+
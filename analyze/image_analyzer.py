@@ -3,30 +3,31 @@ Image Analysis Module using Gemini API
 """
 import google.generativeai as genai
 from PIL import Image
-import json
+import io
+import re
+from analyze.cache import cached, make_key
+from analyze.keywords import KeywordMatcher
+from analyze.parsing import extract_json
 
-class ImageAnalyzer:
-    def __init__(self, api_key):
-        """Initialize the image analyzer with Gemini API"""
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
-        
-    def analyze(self, image_path):
-        """
-        Analyze an image for deepfake/AI-generated content
-        
-        Args:
-            image_path: Path to the image file
-            
-        Returns:
-            dict: Analysis results containing confidence score and details
-        """
-        try:
-            # Load image
-            img = Image.open(image_path)
-            
-            # Create detailed prompt for deepfake detection
-            prompt = """Analyze this image for signs of being a deepfake or AI-generated content. 
+# Long-edge cap before upload; larger images only add bandwidth and tokens
+MAX_IMAGE_EDGE = 1024
+
+# Keywords for parsing free-text responses
+DEEPFAKE_KW = ('deepfake', 'ai-generated', 'artificial', 'synthetic', 'fake', 'manipulated')
+INDICATOR_KW = ('inconsistent', 'unnatural', 'artifact', 'blurr', 'warp', 'irregular')
+
+# Both categories scanned in one pass
+RESPONSE_KEYWORDS = KeywordMatcher({'deepfake': DEEPFAKE_KW, 'indicator': INDICATOR_KW})
+
+# Whole words signalling how certain the model is, strongest first
+STRONG_WORDS = frozenset({'definitely', 'clearly', 'obvious'})
+LIKELY_WORDS = frozenset({'likely', 'probably', 'appears'})
+WEAK_WORDS = frozenset({'possibly', 'might', 'could'})
+
+_WORD_RE = re.compile(r"[a-z]+")
+
+# Detailed prompt for deepfake detection; built once, also part of the cache key
+IMAGE_PROMPT = """Analyze this image for signs of being a deepfake or AI-generated content. 
 
 Please examine the following aspects:
 1. **Facial Features**: Irregularities in eyes, teeth, skin texture, facial symmetry
@@ -47,25 +48,48 @@ Provide your analysis in the following JSON format:
 
 Be thorough and specific in your analysis. Consider both obvious and subtle signs."""
 
-            # Generate analysis
-            response = self.model.generate_content([prompt, img])
+class ImageAnalyzer:
+    def __init__(self, api_key, rate_limiter=None):
+        """
+        Initialize the image analyzer with Gemini API
+        
+        Args:
+            api_key: Google Gemini API key
+            rate_limiter: Optional object with acquire() (e.g. TokenBucket)
+                          called before every request
+        """
+        genai.configure(api_key=api_key)
+        self.model_name = 'gemini-1.5-flash'
+        self.model = genai.GenerativeModel(self.model_name)
+        self.rate_limiter = rate_limiter
+        
+    def analyze(self, image_path):
+        """
+        Analyze an image for deepfake/AI-generated content
+        
+        Args:
+            image_path: Path to the image file
+            
+        Returns:
+            dict: Analysis results containing confidence score and details
+        """
+        try:
+            # Load image and downscale before upload
+            with open(image_path, 'rb') as f:
+                image_bytes = f.read()
+            img = Image.open(io.BytesIO(image_bytes))
+            img.thumbnail((MAX_IMAGE_EDGE, MAX_IMAGE_EDGE), Image.Resampling.LANCZOS)
             
-            # Parse response
-            result_text = response.text
+            # Generate analysis (cached by model, prompt and image content)
+            generate = lambda: self._generate([IMAGE_PROMPT, img])
+            key = make_key(self.model_name, IMAGE_PROMPT, image_bytes)
+            result_text = cached(key, generate)
             
             # Try to extract JSON from response
-            try:
-                # Clean the response text
-                json_start = result_text.find('{')
-                json_end = result_text.rfind('}') + 1
-                
-                if json_start != -1 and json_end > json_start:
-                    json_str = result_text[json_start:json_end]
-                    result = json.loads(json_str)
-                else:
-                    # Fallback: create structured result from text
-                    result = self._parse_text_response(result_text)
-            except json.JSONDecodeError:
+            result = extract_json(result_text)
+            
+            if result is None:
+                # Fallback: create structured result from text
                 result = self._parse_text_response(result_text)
             
             # Ensure all required fields exist
@@ -87,27 +111,47 @@ Be thorough and specific in your analysis. Consider both obvious and subtle sign
                 'error': str(e)
             }
     
+    def _generate(self, contents):
+        """
+        Send one generate_content request, paced by the rate limiter
+        
+        Args:
+            contents: Prompt parts (text and images)
+            
+        Returns:
+            str: Response text
+        """
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        
+        return self.model.generate_content(contents).text
+    
     def _parse_text_response(self, text):
         """Parse text response when JSON extraction fails"""
         # Simple heuristic parsing
-        is_deepfake = any(keyword in text.lower() for keyword in 
-                          ['deepfake', 'ai-generated', 'artificial', 'synthetic', 'fake', 'manipulated'])
+        lowered = text.casefold()
+        
+        # One pass over the whole response for both categories; sentences
+        # are only scanned when some indicator keyword occurs at all
+        found = RESPONSE_KEYWORDS.find(lowered, folded=True)
+        is_deepfake = 'deepfake' in found
         
         # Estimate confidence based on strength of language
+        words = set(_WORD_RE.findall(lowered))
         confidence = 0
-        if any(word in text.lower() for word in ['likely', 'probably', 'appears']):
-            confidence = 65
-        if any(word in text.lower() for word in ['definitely', 'clearly', 'obvious']):
+        if words & STRONG_WORDS:
             confidence = 85
-        if any(word in text.lower() for word in ['possibly', 'might', 'could']):
+        elif words & LIKELY_WORDS:
+            confidence = 65
+        elif words & WEAK_WORDS:
             confidence = 40
         
         # Extract indicators (simple sentence splitting)
         indicators = []
-        for sentence in text.split('.'):
-            if any(keyword in sentence.lower() for keyword in 
-                   ['inconsistent', 'unnatural', 'artifact', 'blurr', 'warp', 'irregular']):
-                indicators.append(sentence.strip())
+        if 'indicator' in found:
+            for sentence, lowered_sentence in zip(text.split('.'), lowered.split('.')):
+                if RESPONSE_KEYWORDS.matches(lowered_sentence, 'indicator', folded=True):
+                    indicators.append(sentence.strip())
         
         return {
             'is_deepfake': is_deepfake,
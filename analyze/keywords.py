@@ -0,0 +1,88 @@
+"""
+Keyword Matching - Single-pass keyword scans over model responses
+"""
+try:
+    # Optional: pyahocorasick scans for every keyword in one pass
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+class KeywordMatcher:
+    """Finds which keyword categories occur in a text"""
+
+    def __init__(self, categories):
+        """
+        Build the matcher
+
+        Args:
+            categories: dict mapping category name to an iterable of keywords
+                        (matched case-insensitively as substrings)
+        """
+        self.categories = {
+            category: tuple(keyword.casefold() for keyword in keywords)
+            for category, keywords in categories.items()
+        }
+        self._automaton = None
+
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+
+            for category, keywords in self.categories.items():
+                for keyword in keywords:
+                    # A keyword may belong to several categories
+                    tags = automaton.get(keyword, frozenset())
+                    automaton.add_word(keyword, tags | {category})
+
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    def find(self, text, folded=False):
+        """
+        Find every category with at least one keyword in text
+
+        Args:
+            text: Text to scan
+            folded: True if text is already casefolded
+
+        Returns:
+            set: Names of the matching categories
+        """
+        lowered = text if folded else text.casefold()
+
+        if self._automaton is None:
+            return {
+                category for category, keywords in self.categories.items()
+                if any(keyword in lowered for keyword in keywords)
+            }
+
+        found = set()
+        for _, tags in self._automaton.iter(lowered):
+            found |= tags
+            if len(found) == len(self.categories):
+                break
+
+        return found
+
+    def matches(self, text, category, folded=False):
+        """
+        Check whether text contains any keyword of a single category
+
+        Args:
+            text: Text to scan
+            category: Category name
+            folded: True if text is already casefolded
+
+        Returns:
+            bool: True on the first matching keyword
+        """
+        lowered = text if folded else text.casefold()
+
+        if self._automaton is None:
+            return any(keyword in lowered for keyword in self.categories[category])
+
+        for _, tags in self._automaton.iter(lowered):
+            if category in tags:
+                return True
+
+        return False
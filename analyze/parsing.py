@@ -0,0 +1,41 @@
+"""
+Response Parsing - Extract JSON objects from model responses
+"""
+import json
+import re
+
+try:
+    # Optional: orjson decodes noticeably faster than the stdlib
+    import orjson
+except ImportError:
+    orjson = None
+
+# Outermost {...} span; also skips surrounding prose and markdown fences
+_JSON_RE = re.compile(rb'\{.*\}', re.S)
+
+
+def extract_json(text):
+    """
+    Extract the JSON object embedded in a model response
+
+    Args:
+        text: Response text
+
+    Returns:
+        dict or None: Parsed object, or None if no valid JSON object was found
+    """
+    match = _JSON_RE.search(text.encode('utf-8'))
+
+    if not match:
+        return None
+
+    try:
+        if orjson is not None:
+            result = orjson.loads(match.group(0))
+        else:
+            result = json.loads(match.group(0))
+    except ValueError:
+        # json.JSONDecodeError and orjson.JSONDecodeError are both ValueErrors
+        return None
+
+    return result if isinstance(result, dict) else None
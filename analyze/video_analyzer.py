@@ -2,32 +2,180 @@
 Video Analysis Module using Gemini API
 """
 import google.generativeai as genai
-from PIL import Image
 import json
 import cv2
+import numpy as np
 import tempfile
 import os
+import time
+import base64
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from analyze.cache import cached, file_digest, get_cache, make_key
+from analyze.keywords import KeywordMatcher
+from analyze.parsing import extract_json
+
+try:
+    # Optional: the google-genai SDK provides the Batch API
+    from google import genai as genai_client
+except ImportError:
+    genai_client = None
+
+try:
+    # Optional: PyAV lets us seek instead of decoding every frame
+    import av
+except ImportError:
+    av = None
+
+# Below this many frames a batch job's queueing delay outweighs its savings
+BATCH_MIN_FRAMES = 4
+BATCH_TERMINAL_STATES = {'JOB_STATE_SUCCEEDED', 'JOB_STATE_FAILED',
+                         'JOB_STATE_CANCELLED', 'JOB_STATE_EXPIRED'}
+
+# Decoded frames allowed to wait for a free worker before decoding pauses
+FRAME_QUEUE_SIZE = 4
+
+# Gemini ingests images at roughly this long edge; larger frames only cost bandwidth
+MAX_FRAME_EDGE = 768
+
+# Frames are encoded once, at this quality, and the bytes reused everywhere
+FRAME_JPEG_QUALITY = 85
+
+# Keywords for frame notes and free-text responses
+SUSPICIOUS_KW = ('suspicious', 'fake', 'manipulated', 'artificial', 'unnatural')
+DEEPFAKE_KW = ('deepfake', 'fake', 'manipulated', 'ai-generated')
+INDICATOR_KW = ('inconsistent', 'unnatural', 'artifact', 'manipulation', 'suspicious')
+
+# All categories scanned in one pass
+RESPONSE_KEYWORDS = KeywordMatcher({
+    'suspicious': SUSPICIOUS_KW,
+    'deepfake': DEEPFAKE_KW,
+    'indicator': INDICATOR_KW,
+})
+
+# The suspicious verdict comes early in a frame note; only scan this much of it
+FRAME_SCAN_LIMIT = 2048
+
+# Shared per-frame instructions; built once, also part of the cache key
+FRAME_PROMPT = """Analyze this video frame for deepfake or AI-generated content.
+
+Focus on:
+1. Facial consistency and realism
+2. Temporal artifacts (if comparing with previous context)
+3. Unnatural movements or transitions
+4. Lighting and shadow consistency
+5. Background consistency
+6. Signs of face-swapping or manipulation
+
+Provide a brief analysis (2-3 sentences) and indicate if this frame seems suspicious."""
+
+# Prompt for analyzing all frames together in a single request
+VIDEO_PROMPT = """Analyze these frames, sampled evenly from one video in order, for deepfake or AI-generated content.
+Each frame is preceded by a header such as "Frame 1/10:".
+
+For each frame, focus on:
+1. Facial consistency and realism
+2. Unnatural movements or transitions
+3. Lighting and shadow consistency
+4. Background consistency
+5. Signs of face-swapping or manipulation
+
+Then compare the frames with each other for temporal consistency.
+
+Provide your assessment in the following JSON format:
+{
+    "is_deepfake": true/false,
+    "confidence_score": 0-100,
+    "analysis": "Overall analysis of the video",
+    "indicators": ["List of deepfake indicators found across frames"],
+    "temporal_consistency": "Assessment of consistency across frames",
+    "frames": [
+        {"frame_number": 1, "is_suspicious": true/false, "note": "Brief analysis (2-3 sentences)"}
+    ]
+}"""
 
 class VideoAnalyzer:
-    def __init__(self, api_key):
-        """Initialize the video analyzer with Gemini API"""
+    def __init__(self, api_key, rate_limiter=None):
+        """
+        Initialize the video analyzer with Gemini API
+        
+        Args:
+            api_key: Google Gemini API key
+            rate_limiter: Optional object with acquire() (e.g. TokenBucket)
+                          called before every synchronous request
+        """
         genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+        self.api_key = api_key
+        self.model_name = 'gemini-1.5-flash'
+        self.model = genai.GenerativeModel(self.model_name)
+        self.rate_limiter = rate_limiter
         
-    def analyze(self, video_path, max_frames=10):
+    def analyze(self, video_path, max_frames=10, concurrency=None, use_batch=False,
+                single_request=True):
         """
         Analyze a video for deepfake content by examining key frames
         
         Args:
             video_path: Path to the video file
             max_frames: Maximum number of frames to analyze
+            concurrency: Number of frames analyzed in parallel
+                         (defaults to min(max_frames, 8))
+            use_batch: Submit frames through the Gemini Batch API (cheaper,
+                       but minutes-scale latency; for non-interactive use)
+            single_request: Send all frames in one multi-image request that
+                            returns per-frame and overall results together;
+                            when False, frames are analyzed one request each
+                            followed by a separate overall assessment
             
         Returns:
             dict: Analysis results containing confidence score and details
         """
         try:
-            # Extract key frames
-            frames = self._extract_frames(video_path, max_frames)
+            # Reuse previously extracted frames when caching is available
+            cache = get_cache()
+            frames_key = None
+            frames = None
+            
+            if cache is not None:
+                frames_key = make_key('frames', file_digest(video_path), str(max_frames), 'timestamped')
+                frames = cache.get(frames_key)
+            
+            # Only freshly extracted frames need writing back to the cache
+            extracted = frames is None
+            
+            if frames is not None:
+                source = iter(frames)
+            else:
+                source = self._iter_frames(video_path, max_frames)
+            
+            frame_results = None
+            result = None
+            overall_text = None
+            
+            if use_batch and genai_client is not None:
+                # Batch jobs need every frame up front
+                frames = list(source)
+                source = iter(frames)
+                
+                if len(frames) >= BATCH_MIN_FRAMES:
+                    frame_results = self._analyze_frames_batch(frames)
+            
+            # Also taken when the batch was too small or failed
+            if frame_results is None and single_request:
+                frames = list(source)
+                source = iter(())
+                
+                if frames:
+                    frame_results, result, overall_text = self._analyze_frames_combined(
+                        [jpeg for _, jpeg in frames])
+            
+            if frame_results is None:
+                if concurrency is None:
+                    concurrency = min(max_frames, 8)
+                frames, frame_results = self._analyze_frames_pipelined(source, concurrency)
+            
+            if frames_key is not None and frames and extracted:
+                cache.set(frames_key, frames)
             
             if not frames:
                 return {
@@ -38,82 +186,14 @@ class VideoAnalyzer:
                     'frame_analysis': {'total_frames': 0, 'suspicious_frames': 0}
                 }
             
-            # Analyze frames
-            frame_results = []
-            suspicious_count = 0
+            suspicious_count = sum(1 for r in frame_results if r['is_suspicious'])
             
-            for idx, frame_path in enumerate(frames):
-                try:
-                    img = Image.open(frame_path)
-                    
-                    prompt = f"""Analyze frame {idx+1}/{len(frames)} of this video for deepfake or AI-generated content.
-
-Focus on:
-1. Facial consistency and realism
-2. Temporal artifacts (if comparing with previous context)
-3. Unnatural movements or transitions
-4. Lighting and shadow consistency
-5. Background consistency
-6. Signs of face-swapping or manipulation
-
-Provide a brief analysis (2-3 sentences) and indicate if this frame seems suspicious."""
-
-                    response = self.model.generate_content([prompt, img])
-                    analysis_text = response.text
-                    
-                    is_suspicious = any(keyword in analysis_text.lower() for keyword in 
-                                      ['suspicious', 'fake', 'manipulated', 'artificial', 'unnatural'])
-                    
-                    if is_suspicious:
-                        suspicious_count += 1
-                    
-                    frame_results.append({
-                        'frame_number': idx + 1,
-                        'is_suspicious': is_suspicious,
-                        'note': analysis_text[:200]  # Truncate for brevity
-                    })
-                    
-                    # Clean up frame file
-                    os.unlink(frame_path)
-                    
-                except Exception as e:
-                    frame_results.append({
-                        'frame_number': idx + 1,
-                        'is_suspicious': False,
-                        'note': f'Error analyzing frame: {str(e)}'
-                    })
+            if overall_text is None:
+                # Per-frame paths need a separate overall assessment
+                overall_text = self._assess_overall(frame_results, suspicious_count)
+                result = extract_json(overall_text)
             
-            # Generate overall analysis
-            overall_prompt = f"""Based on analysis of {len(frames)} frames from a video, where {suspicious_count} frames showed suspicious characteristics:
-
-Provide an overall assessment in JSON format:
-{{
-    "is_deepfake": true/false,
-    "confidence_score": 0-100,
-    "analysis": "Overall analysis of the video",
-    "indicators": ["List of deepfake indicators found across frames"],
-    "temporal_consistency": "Assessment of consistency across frames"
-}}
-
-Consider:
-- Proportion of suspicious frames ({suspicious_count}/{len(frames)})
-- Consistency of artifacts across frames
-- Overall realism and coherence"""
-
-            overall_response = self.model.generate_content(overall_prompt)
-            overall_text = overall_response.text
-            
-            # Parse overall result
-            try:
-                json_start = overall_text.find('{')
-                json_end = overall_text.rfind('}') + 1
-                
-                if json_start != -1 and json_end > json_start:
-                    json_str = overall_text[json_start:json_end]
-                    result = json.loads(json_str)
-                else:
-                    result = self._parse_text_response(overall_text, suspicious_count, len(frames))
-            except json.JSONDecodeError:
+            if result is None:
                 result = self._parse_text_response(overall_text, suspicious_count, len(frames))
             
             # Add frame analysis
@@ -141,59 +221,395 @@ Consider:
                 'error': str(e)
             }
     
-    def _extract_frames(self, video_path, max_frames):
-        """Extract evenly spaced frames from video"""
+    def _assess_overall(self, frame_results, suspicious_count):
+        """Ask for an overall assessment based on per-frame results"""
+        total_frames = len(frame_results)
+        
+        overall_prompt = f"""Based on analysis of {total_frames} frames from a video, where {suspicious_count} frames showed suspicious characteristics:
+
+Provide an overall assessment in JSON format:
+{{
+    "is_deepfake": true/false,
+    "confidence_score": 0-100,
+    "analysis": "Overall analysis of the video",
+    "indicators": ["List of deepfake indicators found across frames"],
+    "temporal_consistency": "Assessment of consistency across frames"
+}}
+
+Consider:
+- Proportion of suspicious frames ({suspicious_count}/{total_frames})
+- Consistency of artifacts across frames
+- Overall realism and coherence"""
+
+        return self._generate(overall_prompt)
+    
+    def _analyze_frames_combined(self, frames):
+        """
+        Analyze all frames in a single multi-image request
+        
+        Args:
+            frames: List of extracted frames (JPEG bytes)
+            
+        Returns:
+            tuple: (frame_results, result, response_text) where result is the
+                   parsed JSON assessment, or None if the response had none
+        """
+        total_frames = len(frames)
+        contents = [VIDEO_PROMPT]
+        key_parts = [self.model_name, VIDEO_PROMPT]
+        
+        for idx, jpeg in enumerate(frames):
+            header = f"Frame {idx+1}/{total_frames}:"
+            contents.extend([header, self._image_part(jpeg)])
+            key_parts.extend([header, jpeg])
+        
+        # Cached by model, prompt and every frame's content
+        response_text = cached(make_key(*key_parts), lambda: self._generate(contents))
+        
+        result = extract_json(response_text)
+        reported = {}
+        
+        if result is not None:
+            for entry in result.pop('frames', None) or []:
+                if isinstance(entry, dict) and 'frame_number' in entry:
+                    reported[str(entry['frame_number'])] = entry
+        
+        frame_results = []
+        for idx in range(total_frames):
+            entry = reported.get(str(idx + 1))
+            
+            if entry is None:
+                frame_results.append({
+                    'frame_number': idx + 1,
+                    'is_suspicious': False,
+                    'note': 'No per-frame analysis returned'
+                })
+            else:
+                frame_results.append({
+                    'frame_number': idx + 1,
+                    'is_suspicious': str(entry.get('is_suspicious', False)).lower() == 'true',
+                    'note': str(entry.get('note', ''))[:200]  # Truncate for brevity
+                })
+        
+        return frame_results, result, response_text
+    
+    def _generate(self, contents):
+        """
+        Send one generate_content request, paced by the rate limiter
+        
+        Args:
+            contents: Prompt parts (text and images)
+            
+        Returns:
+            str: Response text
+        """
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        
+        return self.model.generate_content(contents).text
+    
+    def _frame_prompt(self, timestamp):
+        """
+        Build the per-frame header that accompanies FRAME_PROMPT
+        
+        Frames are labelled by timestamp rather than "i/N": frames are
+        analyzed while extraction is still running, before the number that
+        decode successfully is known.
+        """
+        return f"This frame is taken {timestamp:.2f}s into the video."
+    
+    def _frame_result(self, idx, analysis_text):
+        """Build a frame result entry from the model's analysis text"""
+        is_suspicious = RESPONSE_KEYWORDS.matches(analysis_text[:FRAME_SCAN_LIMIT], 'suspicious')
+        
+        return {
+            'frame_number': idx + 1,
+            'is_suspicious': is_suspicious,
+            'note': analysis_text[:200]  # Truncate for brevity
+        }
+    
+    def _image_part(self, jpeg):
+        """Wrap JPEG bytes as an inline image part for generate_content"""
+        return {'mime_type': 'image/jpeg', 'data': jpeg}
+    
+    def _analyze_single_frame(self, idx, timestamp, jpeg):
+        """Analyze one extracted frame"""
+        try:
+            header = self._frame_prompt(timestamp)
+            part = self._image_part(jpeg)
+            
+            generate = lambda: self._generate([FRAME_PROMPT, header, part])
+            
+            # Cached by model, prompt and decoded frame content
+            key = make_key(self.model_name, FRAME_PROMPT, header, jpeg)
+            analysis_text = cached(key, generate)
+            
+            return self._frame_result(idx, analysis_text)
+            
+        except Exception as e:
+            return {
+                'frame_number': idx + 1,
+                'is_suspicious': False,
+                'note': f'Error analyzing frame: {str(e)}'
+            }
+    
+    def _analyze_frames_pipelined(self, source, concurrency):
+        """
+        Analyze frames while they are still being decoded
+        
+        Frames are handed to the worker pool as soon as they are produced,
+        so decoding overlaps with the network-bound Gemini calls. At most
+        concurrency + FRAME_QUEUE_SIZE frames are in flight at once.
+        
+        Args:
+            source: Iterable of (timestamp, JPEG bytes) tuples
+            concurrency: Number of frames analyzed in parallel
+            
+        Returns:
+            tuple: (frames, frame_results) in frame order, frames being the
+                   (timestamp, JPEG bytes) tuples taken from source
+        """
+        concurrency = max(1, concurrency)
+        slots = threading.BoundedSemaphore(concurrency + FRAME_QUEUE_SIZE)
         frames = []
+        futures = []
+        
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for idx, (timestamp, jpeg) in enumerate(source):
+                slots.acquire()
+                future = pool.submit(self._analyze_single_frame, idx, timestamp, jpeg)
+                future.add_done_callback(lambda _: slots.release())
+                
+                frames.append((timestamp, jpeg))
+                futures.append(future)
+        
+        return frames, [future.result() for future in futures]
+    
+    def _analyze_frames_batch(self, frames, max_poll_interval=60):
+        """
+        Analyze frames through a single Gemini Batch API job
+        
+        Args:
+            frames: List of extracted (timestamp, JPEG bytes) tuples
+            max_poll_interval: Upper bound in seconds for the polling backoff
+            
+        Returns:
+            list or None: Frame results, or None if the batch job failed
+        """
+        jsonl_path = None
+        
+        try:
+            client = genai_client.Client(api_key=self.api_key)
+            
+            # One request per frame, keyed so results can be mapped back
+            with tempfile.NamedTemporaryFile('w', delete=False, suffix='.jsonl') as jsonl_file:
+                for idx, (timestamp, jpeg) in enumerate(frames):
+                    data = base64.b64encode(jpeg).decode('ascii')
+                    
+                    request = {'contents': [{'parts': [
+                        {'inline_data': {'mime_type': 'image/jpeg', 'data': data}},
+                        {'text': FRAME_PROMPT},
+                        {'text': self._frame_prompt(timestamp)}
+                    ]}]}
+                    jsonl_file.write(json.dumps({'key': f'frame_{idx}', 'request': request}) + '\n')
+                jsonl_path = jsonl_file.name
+            
+            uploaded_file = client.files.upload(file=jsonl_path, config={'mime_type': 'jsonl'})
+            batch_job = client.batches.create(model=self.model_name, src=uploaded_file.name)
+            
+            # Poll with exponential backoff until the job settles
+            delay = 2
+            while batch_job.state.name not in BATCH_TERMINAL_STATES:
+                time.sleep(delay)
+                delay = min(delay * 2, max_poll_interval)
+                batch_job = client.batches.get(name=batch_job.name)
+            
+            if batch_job.state.name != 'JOB_STATE_SUCCEEDED':
+                print(f"Batch job ended in state {batch_job.state.name}")
+                return None
+            
+            output = client.files.download(file=batch_job.dest.file_name)
+            
+            texts = {}
+            for line in output.decode('utf-8').splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                try:
+                    texts[entry['key']] = entry['response']['candidates'][0]['content']['parts'][0]['text']
+                except (KeyError, IndexError):
+                    texts[entry['key']] = None
+            
+            frame_results = []
+            for idx in range(len(frames)):
+                text = texts.get(f'frame_{idx}')
+                if text is None:
+                    frame_results.append({
+                        'frame_number': idx + 1,
+                        'is_suspicious': False,
+                        'note': 'Error analyzing frame: no result returned by batch job'
+                    })
+                else:
+                    frame_results.append(self._frame_result(idx, text))
+            
+            return frame_results
+            
+        except Exception as e:
+            print(f"Batch analysis error: {str(e)}")
+            return None
+        
+        finally:
+            if jsonl_path and os.path.exists(jsonl_path):
+                os.unlink(jsonl_path)
+    
+    def _iter_frames(self, video_path, max_frames):
+        """
+        Yield evenly spaced frames from video as in-memory JPEG bytes,
+        as soon as each one is decoded
+        
+        Yields:
+            tuple: (timestamp in seconds, JPEG bytes)
+        """
+        if av is not None:
+            yielded = False
+            try:
+                for item in self._iter_frames_av(video_path, max_frames):
+                    yielded = True
+                    yield item
+            except Exception as e:
+                if yielded:
+                    # Restarting with OpenCV would repeat frames already analyzed
+                    print(f"PyAV frame extraction stopped early: {str(e)}")
+                    return
+                print(f"PyAV frame extraction failed, falling back to OpenCV: {str(e)}")
+            
+            if yielded:
+                return
+        
+        yield from self._iter_frames_cv2(video_path, max_frames)
+    
+    def _iter_frames_av(self, video_path, max_frames):
+        """
+        Yield evenly spaced frames by seeking with PyAV
+        
+        Each target timestamp is reached with a keyframe seek followed by
+        decoding forward to the target, so at most one keyframe interval
+        is decoded per frame instead of the whole stream.
+        """
+        container = av.open(video_path)
+        try:
+            stream = container.streams.video[0]
+            stream.thread_type = 'AUTO'
+            
+            duration = stream.duration
+            if not duration and container.duration:
+                # Container duration is in av.time_base units
+                duration = int(container.duration / av.time_base / stream.time_base)
+            if not duration and stream.frames and stream.average_rate:
+                duration = int(stream.frames / stream.average_rate / stream.time_base)
+            if not duration:
+                return
+            
+            start = stream.start_time or 0
+            seen_pts = set()
+            
+            for i in range(max_frames):
+                target_pts = start + int(duration * i / max_frames)
+                container.seek(target_pts, any_frame=False, backward=True, stream=stream)
+                
+                # The seek lands on the keyframe at or before the target
+                frame = None
+                for frame in container.decode(stream):
+                    if frame.pts is None or frame.pts >= target_pts:
+                        break
+                
+                if frame is None or frame.pts in seen_pts:
+                    # Targets closer together than one frame land on the same one
+                    continue
+                seen_pts.add(frame.pts)
+                
+                timestamp = frame.time
+                if timestamp is None:
+                    timestamp = float((target_pts - start) * stream.time_base)
+                
+                yield timestamp, self._encode(frame.to_ndarray(format='bgr24'))
+        finally:
+            container.close()
+    
+    def _iter_frames_cv2(self, video_path, max_frames):
+        """
+        Yield evenly spaced frames by seeking with OpenCV
+        
+        Seeking to each target skips decoding the frames in between (the
+        backend seeks to the nearest keyframe and decodes forward from there).
+        """
+        cap = None
         
         try:
             cap = cv2.VideoCapture(video_path)
             total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
             
             if total_frames == 0:
-                return []
-            
-            # Calculate frame interval
-            interval = max(1, total_frames // max_frames)
+                return
             
-            frame_count = 0
-            extracted = 0
+            # Evenly spaced target frame indices
+            targets = np.unique(np.linspace(0, total_frames - 1, min(max_frames, total_frames), dtype=int))
             
-            while extracted < max_frames and cap.isOpened():
+            for target in targets:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, int(target))
                 ret, frame = cap.read()
                 
                 if not ret:
-                    break
+                    # Frame count is only an estimate for some containers
+                    continue
                 
-                if frame_count % interval == 0:
-                    # Save frame to temp file
-                    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
-                    cv2.imwrite(temp_file.name, frame)
-                    frames.append(temp_file.name)
-                    extracted += 1
-                
-                frame_count += 1
-            
-            cap.release()
+                # Position of the frame just read
+                yield cap.get(cv2.CAP_PROP_POS_MSEC) / 1000, self._encode(frame)
             
         except Exception as e:
             print(f"Error extracting frames: {str(e)}")
         
-        return frames
+        finally:
+            if cap is not None:
+                cap.release()
+    
+    def _encode(self, frame):
+        """Downscale a BGR frame array and encode it to JPEG bytes"""
+        ok, buffer = cv2.imencode('.jpg', self._downscale(frame), [cv2.IMWRITE_JPEG_QUALITY, FRAME_JPEG_QUALITY])
+        
+        if not ok:
+            raise ValueError('Could not encode frame as JPEG')
+        
+        return buffer.tobytes()
+    
+    def _downscale(self, frame):
+        """Shrink a frame array so its long edge is at most MAX_FRAME_EDGE"""
+        h, w = frame.shape[:2]
+        scale = MAX_FRAME_EDGE / max(h, w)
+        
+        if scale < 1.0:
+            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        
+        return frame
     
     def _parse_text_response(self, text, suspicious_count, total_frames):
         """Parse text response when JSON extraction fails"""
         ratio = suspicious_count / total_frames if total_frames > 0 else 0
         
-        is_deepfake = ratio > 0.3 or any(keyword in text.lower() for keyword in 
-                                         ['deepfake', 'fake', 'manipulated', 'ai-generated'])
+        lowered = text.casefold()
+        
+        # One pass over the whole response for both categories; sentences
+        # are only scanned when some indicator keyword occurs at all
+        found = RESPONSE_KEYWORDS.find(lowered, folded=True)
+        is_deepfake = ratio > 0.3 or 'deepfake' in found
         
         confidence = min(95, int(ratio * 100)) if is_deepfake else max(5, int((1 - ratio) * 100))
         
         indicators = []
-        for sentence in text.split('.'):
-            if any(keyword in sentence.lower() for keyword in 
-                   ['inconsistent', 'unnatural', 'artifact', 'manipulation', 'suspicious']):
-                indicators.append(sentence.strip())
+        if 'indicator' in found:
+            for sentence, lowered_sentence in zip(text.split('.'), lowered.split('.')):
+                if RESPONSE_KEYWORDS.matches(lowered_sentence, 'indicator', folded=True):
+                    indicators.append(sentence.strip())
         
         return {
             'is_deepfake': is_deepfake,
@@ -3,6 +3,7 @@ Deepfake Detection System - Main Streamlit Application
 """
 import streamlit as st
 import os
+import shutil
 from pathlib import Path
 from utils.detect import DeepfakeDetector
 from utils.media_io import MediaHandler
@@ -21,6 +22,11 @@ if 'analysis_complete' not in st.session_state:
 if 'results' not in st.session_state:
     st.session_state.results = None
 
+@st.cache_resource
+def get_detector(api_key):
+    """Get a detector shared across reruns for this API key"""
+    return DeepfakeDetector(api_key)
+
 def main():
     # Header
     st.title("🔍 Deepfake Detection System")
@@ -111,13 +117,14 @@ def main():
             if st.button("🚀 Analyze Media", type="primary", use_container_width=True):
                 with st.spinner("🔍 Analyzing media... This may take a moment."):
                     try:
-                        # Save uploaded file temporarily
+                        # Save uploaded file temporarily, streaming in 1MB chunks
+                        uploaded_file.seek(0)
                         with tempfile.NamedTemporaryFile(delete=False, suffix=Path(uploaded_file.name).suffix) as tmp_file:
-                            tmp_file.write(uploaded_file.getvalue())
+                            shutil.copyfileobj(uploaded_file, tmp_file, length=1024 * 1024)
                             tmp_path = tmp_file.name
                         
-                        # Initialize detector
-                        detector = DeepfakeDetector(api_key)
+                        # Reuse the cached detector
+                        detector = get_detector(api_key)
                         
                         # Perform analysis
                         if media_type == "Image":
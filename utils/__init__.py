@@ -5,5 +5,6 @@ Utility functions for the deepfake detection system
 """
 from .detect import DeepfakeDetector
 from .media_io import MediaHandler
+from .ratelimit import TokenBucket
 
-__all__ = ['DeepfakeDetector', 'MediaHandler']
\ No newline at end of file
+__all__ = ['DeepfakeDetector', 'MediaHandler', 'TokenBucket']
\ No newline at end of file
@@ -1,30 +1,51 @@
 """
 Detection Orchestrator - Coordinates image and video analysis
 """
-import sys
-from pathlib import Path
-
-# Add parent directory to path for imports
-sys.path.append(str(Path(__file__).parent.parent))
-
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from analyze.image_analyzer import ImageAnalyzer
 from analyze.video_analyzer import VideoAnalyzer
-from utils.media_io import MediaHandler
+from .media_io import MediaHandler
+from .ratelimit import TokenBucket
 
 class DeepfakeDetector:
     """Main detector class that orchestrates the analysis"""
     
-    def __init__(self, api_key):
+    def __init__(self, api_key, rpm=15):
         """
         Initialize detector with Gemini API key
         
         Args:
             api_key: Google Gemini API key
+            rpm: Requests per minute allowed by your Gemini API tier
+                 (None disables client-side rate limiting)
         """
         self.api_key = api_key
-        self.image_analyzer = ImageAnalyzer(api_key)
-        self.video_analyzer = VideoAnalyzer(api_key)
         self.media_handler = MediaHandler()
+        
+        # Shared by both analyzers so their requests draw from one budget
+        self.rate_limiter = TokenBucket(rpm) if rpm else None
+        
+        # Analyzers are built on first use
+        self._image_analyzer = None
+        self._video_analyzer = None
+        self._lock = threading.Lock()
+    
+    @property
+    def image_analyzer(self):
+        """ImageAnalyzer, created on first access"""
+        with self._lock:
+            if self._image_analyzer is None:
+                self._image_analyzer = ImageAnalyzer(self.api_key, rate_limiter=self.rate_limiter)
+            return self._image_analyzer
+    
+    @property
+    def video_analyzer(self):
+        """VideoAnalyzer, created on first access"""
+        with self._lock:
+            if self._video_analyzer is None:
+                self._video_analyzer = VideoAnalyzer(self.api_key, rate_limiter=self.rate_limiter)
+            return self._video_analyzer
     
     def analyze_image(self, image_path):
         """
@@ -55,13 +76,14 @@ class DeepfakeDetector:
         
         return results
     
-    def analyze_video(self, video_path, max_frames=10):
+    def analyze_video(self, video_path, max_frames=10, use_batch=False):
         """
         Analyze a video for deepfake content
         
         Args:
             video_path: Path to the video file
             max_frames: Maximum number of frames to analyze
+            use_batch: Analyze frames through the Gemini Batch API
             
         Returns:
             dict: Analysis results
@@ -77,8 +99,12 @@ class DeepfakeDetector:
                 'error': 'File validation failed'
             }
         
+        # The analyzer reads the video itself; don't keep the file open
+        # (callers typically delete uploads right after analysis)
+        self.media_handler.release(video_path)
+        
         # Perform analysis
-        results = self.video_analyzer.analyze(video_path, max_frames)
+        results = self.video_analyzer.analyze(video_path, max_frames, use_batch=use_batch)
         
         # Add metadata
         results['media_type'] = 'video'
@@ -86,35 +112,34 @@ class DeepfakeDetector:
         
         return results
     
-    def batch_analyze(self, file_paths, media_type='auto'):
+    def batch_analyze(self, file_paths, media_type='auto', max_workers=4):
         """
-        Analyze multiple files
+        Analyze multiple files concurrently
         
         Args:
             file_paths: List of file paths
             media_type: 'image', 'video', or 'auto' (detect from extension)
+            max_workers: Maximum number of files analyzed at once
             
         Returns:
-            list: List of analysis results
+            list: List of analysis results, in the same order as file_paths
         """
-        results = []
-        
-        for file_path in file_paths:
-            if media_type == 'auto':
-                if self.media_handler.is_image(file_path):
-                    result = self.analyze_image(file_path)
-                elif self.media_handler.is_video(file_path):
-                    result = self.analyze_video(file_path)
-                else:
-                    result = {
-                        'error': 'Unknown file type',
-                        'file_path': file_path
-                    }
-            elif media_type == 'image':
-                result = self.analyze_image(file_path)
-            else:
-                result = self.analyze_video(file_path)
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            futures = [pool.submit(self._dispatch, file_path, media_type) for file_path in file_paths]
+            return [future.result() for future in futures]
+    
+    def _dispatch(self, file_path, media_type):
+        """Analyze one file with the analyzer matching its media type"""
+        if media_type == 'auto':
+            media_type = self.media_handler.classify(file_path)
             
-            results.append(result)
+            if media_type is None:
+                return {
+                    'error': 'Unknown file type',
+                    'file_path': file_path
+                }
         
-        return results
\ No newline at end of file
+        if media_type == 'image':
+            return self.analyze_image(file_path)
+        else:
+            return self.analyze_video(file_path)
\ No newline at end of file
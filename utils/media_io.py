@@ -1,41 +1,223 @@
 """
 Media Input/Output Handler - File operations and validation
 """
+import collections
+import contextlib
+import functools
+import json
+import logging
 import os
-from pathlib import Path
+import shutil
+import subprocess
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from PIL import Image
 import cv2
+import numpy as np
+
+try:
+    # Optional: libjpeg-turbo reads a JPEG header without walking the bitstream
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    _turbojpeg = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    # Package missing, or installed without the libturbojpeg shared library
+    _turbojpeg = None
+
+_log = logging.getLogger(__name__)
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Bytes read for the JPEG header probe (SOI through SOF)
+JPEG_PROBE_SIZE = 64 * 1024
+
+# Quality of JPEGs written by resize_image
+OUTPUT_JPEG_QUALITY = 85
+
+# resize_image filter names for the OpenCV backend
+CV2_INTERPOLATION = {
+    'nearest': 'INTER_NEAREST',
+    'bilinear': 'INTER_LINEAR',
+    'bicubic': 'INTER_CUBIC',
+    'lanczos': 'INTER_LANCZOS4',
+    'area': 'INTER_AREA',
+    'box': 'INTER_AREA'
+}
+
+# Shrink-on-load read flags by reduction factor, largest first
+CV2_REDUCED_READ = ((8, 'IMREAD_REDUCED_COLOR_8'), (4, 'IMREAD_REDUCED_COLOR_4'),
+                    (2, 'IMREAD_REDUCED_COLOR_2'))
+
+# ffprobe reads container metadata without initializing a decoder (optional)
+FFPROBE = shutil.which('ffprobe')
+FFPROBE_TIMEOUT = 30
+
+
+def _parse_rate(rate):
+    """Parse an ffprobe frame rate such as '30000/1001' (0.0 if unknown)"""
+    num, _, den = (rate or '0').partition('/')
+    try:
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+@functools.lru_cache(maxsize=256)
+def _ffprobe_info(file_path, mtime_ns):
+    """
+    Read video metadata from the container header with ffprobe
+    
+    Cached per (path, modification time); callers pass a fresh mtime so a
+    rewritten file is probed again.
+    
+    Returns:
+        dict or None: Same keys as get_video_info (minus file_size), or None
+                      if ffprobe is unavailable or cannot read the file
+    """
+    if FFPROBE is None:
+        return None
+    
+    try:
+        proc = subprocess.run(
+            [FFPROBE, '-v', 'error', '-print_format', 'json',
+             '-show_format', '-show_streams', file_path],
+            capture_output=True, timeout=FFPROBE_TIMEOUT
+        )
+        if proc.returncode != 0:
+            return None
+        
+        probe = json.loads(proc.stdout)
+        stream = next(s for s in probe.get('streams', []) if s.get('codec_type') == 'video')
+    except (OSError, subprocess.TimeoutExpired, ValueError, StopIteration):
+        return None
+    
+    fps = _parse_rate(stream.get('avg_frame_rate'))
+    duration = float(stream.get('duration') or probe.get('format', {}).get('duration') or 0)
+    
+    # nb_frames is missing for some containers (e.g. MKV); estimate it
+    frame_count = int(stream.get('nb_frames') or round(duration * fps))
+    
+    return {
+        'frame_count': frame_count,
+        'fps': fps,
+        'width': int(stream.get('width', 0)),
+        'height': int(stream.get('height', 0)),
+        'duration': int(frame_count / fps) if fps > 0 else 0
+    }
+
+
+def _suffix(file_path):
+    """Lowercase extension of file_path, as Path(file_path).suffix without building a Path"""
+    file_path = os.fspath(file_path)
+    
+    name_start = file_path.rfind(os.sep)
+    if os.altsep:
+        name_start = max(name_start, file_path.rfind(os.altsep))
+    name_start += 1
+    
+    # A leading dot (".bashrc") or a trailing one ("file.") is not an extension
+    dot = file_path.rfind('.')
+    if dot <= name_start or dot == len(file_path) - 1:
+        return ''
+    
+    return file_path[dot:].lower()
+
+
+def _validate_image_worker(args):
+    """Process-pool worker for MediaHandler.validate_images"""
+    enhanced_validation, file_path = args
+    return MediaHandler().validate_image(file_path, enhanced_validation)
+
+
+def _resize_image_worker(args):
+    """Process-pool worker for MediaHandler.resize_images"""
+    resample, image_path, max_size, output_path = args
+    return MediaHandler(resample).resize_image(image_path, max_size, output_path)
+
+
+def _chunksize(n_items, max_workers):
+    """Items per pool task: about four tasks per worker"""
+    return max(1, n_items // (4 * (max_workers or os.cpu_count() or 1)))
 
 class MediaHandler:
     """Handles media file operations, validation, and processing"""
     
+    # Default for validate_image: decode-level checks (True) or only
+    # extension + existence (False, for trusted sources). Instances created
+    # without enhanced_validation follow changes to this attribute.
+    ENHANCED_VALIDATION = True
+    
     # Supported file extensions
     IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.gif'}
     VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mov', '.mkv', '.flv', '.wmv'}
     
-    def __init__(self):
-        """Initialize media handler"""
-        pass
+    # Media kind by extension, for classify()
+    _EXT_KIND = {
+        **{ext: 'image' for ext in IMAGE_EXTENSIONS},
+        **{ext: 'video' for ext in VIDEO_EXTENSIONS}
+    }
+    
+    # Forward gaps up to this many frames are skipped with grab() instead of a seek
+    MAX_GRAB_SKIP = 64
+    
+    # Number of videos whose captures are kept open
+    CAP_CACHE_SIZE = 4
+    
+    # Number of paths whose stat() results are remembered
+    STAT_CACHE_SIZE = 256
+    
+    def __init__(self, resample='lanczos', enhanced_validation=None):
+        """
+        Initialize media handler
+        
+        Args:
+            resample: Resampling filter for resize_image ('lanczos', 'bicubic',
+                      'bilinear', ... or a PIL.Image.Resampling value)
+            enhanced_validation: Default for validate_image (None uses
+                                 MediaHandler.ENHANCED_VALIDATION)
+        """
+        self.resample = resample
+        self.enhanced_validation = enhanced_validation
+        
+        # Open captures by path (least recently used first) and the next
+        # frame each one will read
+        self._cap_cache = collections.OrderedDict()
+        self._cap_pos = {}
+        self._cap_lock = threading.Lock()
+        
+        # stat() results by path (least recently used first)
+        self._stat_cache = collections.OrderedDict()
+        self._stat_lock = threading.Lock()
     
-    def validate_image(self, file_path):
+    def validate_image(self, file_path, enhanced_validation=None):
         """
         Validate if file is a valid image
         
         Args:
             file_path: Path to the file
+            enhanced_validation: Check the image data, not just the extension
+                                 and existence (None uses the handler default)
             
         Returns:
             bool: True if valid image, False otherwise
         """
         try:
-            # Check if file exists
-            if not os.path.exists(file_path):
+            # Check extension first; it needs no filesystem access
+            ext = _suffix(file_path)
+            if ext not in self.IMAGE_EXTENSIONS:
                 return False
             
-            # Check extension
-            if not self.is_image(file_path):
+            # Check if file exists
+            if self._stat(file_path) is None:
                 return False
             
+            if not self._enhanced_validation(enhanced_validation):
+                return True
+            
+            # Header probe for JPEG/PNG; anything it can't vouch for goes to PIL
+            if self._probe_header(file_path, ext):
+                return True
+            
             # Try to open with PIL
             img = Image.open(file_path)
             img.verify()
@@ -43,9 +225,59 @@ class MediaHandler:
             return True
             
         except Exception as e:
-            print(f"Image validation error: {str(e)}")
+            _log.warning("Image validation error: %s", e)
             return False
     
+    def _enhanced_validation(self, enhanced_validation):
+        """Resolve the enhanced_validation setting: call, instance, then class"""
+        if enhanced_validation is None:
+            enhanced_validation = self.enhanced_validation
+        if enhanced_validation is None:
+            enhanced_validation = self.ENHANCED_VALIDATION
+        return enhanced_validation
+    
+    def _probe_header(self, file_path, ext):
+        """
+        Check an image header without reading the whole file
+        
+        JPEG headers are parsed with libjpeg-turbo (when installed); PNG
+        files need a valid signature and IHDR chunk CRC. Unlike PIL's
+        verify(), this does not detect truncated image data.
+        
+        Args:
+            file_path: Path to the image
+            ext: Lowercase file extension
+            
+        Returns:
+            bool: True if the header is valid, False if the probe is
+                  unavailable or inconclusive
+        """
+        if ext in ('.jpg', '.jpeg'):
+            if _turbojpeg is None:
+                return False
+            
+            with open(file_path, 'rb') as f:
+                buf = f.read(JPEG_PROBE_SIZE)
+            
+            try:
+                _turbojpeg.decode_header(buf)
+                return True
+            except OSError:
+                # e.g. SOF beyond the probe window; let PIL decide
+                return False
+        
+        if ext == '.png':
+            # Signature, IHDR length + type, 13 bytes of IHDR data, CRC
+            with open(file_path, 'rb') as f:
+                head = f.read(33)
+            
+            if len(head) < 33 or head[:8] != PNG_SIGNATURE or head[12:16] != b'IHDR':
+                return False
+            
+            return zlib.crc32(head[12:29]) == int.from_bytes(head[29:33], 'big')
+        
+        return False
+    
     def validate_video(self, file_path):
         """
         Validate if file is a valid video
@@ -57,28 +289,32 @@ class MediaHandler:
             bool: True if valid video, False otherwise
         """
         try:
-            # Check if file exists
-            if not os.path.exists(file_path):
-                return False
-            
-            # Check extension
+            # Check extension first; it needs no filesystem access
             if not self.is_video(file_path):
                 return False
             
-            # Try to open with OpenCV
-            cap = cv2.VideoCapture(file_path)
-            
-            if not cap.isOpened():
+            # Check if file exists
+            if self._stat(file_path) is None:
                 return False
             
-            # Try to read first frame
-            ret, frame = cap.read()
-            cap.release()
+            # Try to open with OpenCV
+            with self._opened_cap(file_path) as cap:
+                
+                if not cap.isOpened():
+                    return False
+                
+                # Cached capture may have been read already
+                if self._cap_pos[file_path] != 0:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                
+                # Try to grab first frame; its pixels are never retrieved
+                ret = cap.grab()
+                self._cap_pos[file_path] = 1 if ret else -1
             
             return ret
             
         except Exception as e:
-            print(f"Video validation error: {str(e)}")
+            _log.warning("Video validation error: %s", e)
             return False
     
     def is_image(self, file_path):
@@ -91,8 +327,7 @@ class MediaHandler:
         Returns:
             bool: True if image extension
         """
-        ext = Path(file_path).suffix.lower()
-        return ext in self.IMAGE_EXTENSIONS
+        return _suffix(file_path) in self.IMAGE_EXTENSIONS
     
     def is_video(self, file_path):
         """
@@ -104,8 +339,89 @@ class MediaHandler:
         Returns:
             bool: True if video extension
         """
-        ext = Path(file_path).suffix.lower()
-        return ext in self.VIDEO_EXTENSIONS
+        return _suffix(file_path) in self.VIDEO_EXTENSIONS
+    
+    def classify(self, file_path):
+        """
+        Get the media kind of a file based on extension
+        
+        Args:
+            file_path: Path to the file
+            
+        Returns:
+            str or None: 'image', 'video', or None for unsupported extensions
+        """
+        return self._EXT_KIND.get(_suffix(file_path))
+    
+    def invalidate(self, file_path=None):
+        """
+        Forget cached stat() results after a file is written or replaced
+        
+        Args:
+            file_path: Path to forget (None forgets every path)
+        """
+        with self._stat_lock:
+            if file_path is None:
+                self._stat_cache.clear()
+            else:
+                self._stat_cache.pop(file_path, None)
+    
+    def _stat(self, file_path):
+        """
+        stat() a path, reusing the result for repeated lookups
+        
+        Missing files are not cached, so a path that appears later is seen.
+        
+        Returns:
+            os.stat_result or None: File status, or None if it does not exist
+        """
+        with self._stat_lock:
+            st = self._stat_cache.get(file_path)
+            if st is not None:
+                self._stat_cache.move_to_end(file_path)
+                return st
+        
+        try:
+            st = os.stat(file_path)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        
+        self._remember_stat(file_path, st)
+        return st
+    
+    def _remember_stat(self, file_path, st):
+        """Store a stat() result in the cache, evicting the oldest entries"""
+        with self._stat_lock:
+            self._stat_cache[file_path] = st
+            self._stat_cache.move_to_end(file_path)
+            while len(self._stat_cache) > self.STAT_CACHE_SIZE:
+                self._stat_cache.popitem(last=False)
+    
+    def iter_media(self, directory):
+        """
+        List the media files in a directory (not recursive, symlinks skipped)
+        
+        Uses os.scandir, so file types come with the directory listing; the
+        stat() of each match is remembered, so validating or getting info
+        for the yielded paths right away needs no further stat() call.
+        
+        Args:
+            directory: Directory to scan
+            
+        Yields:
+            tuple: (path, kind, file_size) with kind 'image' or 'video'
+        """
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                kind = self._EXT_KIND.get(_suffix(entry.name))
+                
+                if kind is None or not entry.is_file(follow_symlinks=False):
+                    continue
+                
+                st = entry.stat(follow_symlinks=False)
+                self._remember_stat(entry.path, st)
+                
+                yield entry.path, kind, st.st_size
     
     def get_image_info(self, file_path):
         """
@@ -126,7 +442,7 @@ class MediaHandler:
                 'size': img.size,
                 'width': img.width,
                 'height': img.height,
-                'file_size': os.path.getsize(file_path)
+                'file_size': self._stat(file_path).st_size
             }
         except Exception as e:
             return {'error': str(e)}
@@ -142,27 +458,44 @@ class MediaHandler:
             dict: Video information
         """
         try:
-            cap = cv2.VideoCapture(file_path)
-            
-            if not cap.isOpened():
-                return {'error': 'Could not open video'}
-            
-            info = {
-                'frame_count': int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
-                'fps': cap.get(cv2.CAP_PROP_FPS),
-                'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
-                'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
-                'duration': int(cap.get(cv2.CAP_PROP_FRAME_COUNT) / cap.get(cv2.CAP_PROP_FPS)) if cap.get(cv2.CAP_PROP_FPS) > 0 else 0,
-                'file_size': os.path.getsize(file_path)
-            }
+            # Header-only probe when ffprobe is installed. The probe cache is
+            # keyed by mtime, so stat afresh: a cached stat would keep serving
+            # a rewritten file's old metadata
+            try:
+                st = os.stat(file_path)
+            except (FileNotFoundError, NotADirectoryError):
+                st = None
+            else:
+                self._remember_stat(file_path, st)
+            
+            if st is not None:
+                info = _ffprobe_info(file_path, st.st_mtime_ns)
+                if info is not None:
+                    return dict(info, file_size=st.st_size)
+            
+            with self._opened_cap(file_path) as cap:
+                
+                if not cap.isOpened():
+                    return {'error': 'Could not open video'}
+                
+                frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+                fps = cap.get(cv2.CAP_PROP_FPS)
+                
+                info = {
+                    'frame_count': frame_count,
+                    'fps': fps,
+                    'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                    'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                    'duration': int(frame_count / fps) if fps > 0 else 0,
+                    'file_size': self._stat(file_path).st_size
+                }
             
-            cap.release()
             return info
             
         except Exception as e:
             return {'error': str(e)}
     
-    def extract_frame(self, video_path, frame_number, output_path=None):
+    def extract_frame(self, video_path, frame_number, output_path=None, out_format='bgr'):
         """
         Extract a specific frame from video
         
@@ -170,16 +503,15 @@ class MediaHandler:
             video_path: Path to the video
             frame_number: Frame number to extract
             output_path: Path to save the frame (optional)
+            out_format: Returned frame type: 'bgr' or 'rgb' array, or 'pil'
+                        for a PIL.Image (ignored with output_path)
             
         Returns:
-            numpy.ndarray or str: Frame array or path to saved frame
+            numpy.ndarray, PIL.Image or str: Frame or path to saved frame
         """
         try:
-            cap = cv2.VideoCapture(video_path)
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-            
-            ret, frame = cap.read()
-            cap.release()
+            with self._opened_cap(video_path) as cap:
+                ret, frame = self._read_frame_at(video_path, cap, frame_number)
             
             if not ret:
                 return None
@@ -188,13 +520,184 @@ class MediaHandler:
                 cv2.imwrite(output_path, frame)
                 return output_path
             
-            return frame
+            return self._convert_frame(frame, out_format)
             
         except Exception as e:
-            print(f"Frame extraction error: {str(e)}")
+            _log.warning("Frame extraction error: %s", e)
             return None
     
-    def resize_image(self, image_path, max_size=(1920, 1080), output_path=None):
+    def extract_frames(self, video_path, frame_numbers, out_format='bgr'):
+        """
+        Extract several frames from video in a single forward sweep
+        
+        Args:
+            video_path: Path to the video
+            frame_numbers: Frame numbers to extract (any order)
+            out_format: 'bgr', 'rgb' or 'pil' (see extract_frame)
+            
+        Returns:
+            list: Frames (or None where extraction failed), in the order of
+                  frame_numbers
+        """
+        frames = {}
+        
+        try:
+            with self._opened_cap(video_path) as cap:
+                
+                # Sorted so small gaps are crossed with grab() rather than seeks
+                for frame_number in sorted(set(frame_numbers)):
+                    ret, frame = self._read_frame_at(video_path, cap, frame_number)
+                    frames[frame_number] = self._convert_frame(frame, out_format) if ret else None
+            
+        except Exception as e:
+            _log.warning("Frame extraction error: %s", e)
+        
+        return [frames.get(frame_number) for frame_number in frame_numbers]
+    
+    def _convert_frame(self, frame, out_format):
+        """
+        Convert a freshly decoded BGR frame without extra copies
+        
+        Args:
+            frame: BGR frame from OpenCV (overwritten for 'rgb')
+            out_format: 'bgr', 'rgb' or 'pil'
+            
+        Returns:
+            numpy.ndarray or PIL.Image: Converted frame
+        """
+        if out_format == 'bgr':
+            return frame
+        
+        if out_format not in ('rgb', 'pil'):
+            raise ValueError(f"Unknown frame format: {out_format}")
+        
+        if out_format == 'pil':
+            height, width = frame.shape[:2]
+            
+            # PIL's raw decoder swaps channels while copying into its own
+            # storage, so the image is the only copy and frame is untouched
+            return Image.frombuffer('RGB', (width, height), frame, 'raw', 'BGR', 0, 1)
+        
+        # OpenCV still copies the source internally when dst is src; passing
+        # dst only returns the result in the caller's buffer
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame)
+        
+        return frame
+    
+    def release(self, video_path):
+        """
+        Release the cached capture for one video (e.g. before deleting it)
+        
+        Args:
+            video_path: Path to the video
+        """
+        with self._cap_lock:
+            cap = self._cap_cache.pop(video_path, None)
+            self._cap_pos.pop(video_path, None)
+        
+        if cap is not None:
+            cap.release()
+    
+    def close(self):
+        """Release every cached video capture"""
+        with self._cap_lock:
+            caps = list(self._cap_cache.values())
+            self._cap_cache.clear()
+            self._cap_pos.clear()
+        
+        for cap in caps:
+            cap.release()
+    
+    @contextlib.contextmanager
+    def _opened_cap(self, video_path):
+        """
+        Hold the capture lock and yield the capture for video_path
+        
+        The capture is released on exit unless it is cached. If the body
+        raises, a cached capture is evicted and released as well, since its
+        position is unknown; nothing is left for the garbage collector.
+        """
+        with self._cap_lock:
+            cap = self._get_cap(video_path)
+            completed = False
+            
+            try:
+                yield cap
+                completed = True
+            finally:
+                cached = self._cap_cache.get(video_path) is cap
+                
+                if cached and not completed:
+                    del self._cap_cache[video_path]
+                    self._cap_pos.pop(video_path, None)
+                
+                if not (cached and completed):
+                    cap.release()
+    
+    def _get_cap(self, video_path):
+        """
+        Get an open capture for video_path, reusing a cached one if possible
+        
+        Callers must hold self._cap_lock (see _opened_cap). Captures that
+        fail to open are returned but not cached.
+        """
+        cap = self._cap_cache.get(video_path)
+        
+        if cap is not None:
+            self._cap_cache.move_to_end(video_path)
+            return cap
+        
+        cap = cv2.VideoCapture(video_path)
+        
+        if not cap.isOpened():
+            return cap
+        
+        self._cap_cache[video_path] = cap
+        self._cap_pos[video_path] = 0
+        
+        # Evict the least recently used captures
+        while len(self._cap_cache) > self.CAP_CACHE_SIZE:
+            old_path, old_cap = self._cap_cache.popitem(last=False)
+            self._cap_pos.pop(old_path, None)
+            old_cap.release()
+        
+        return cap
+    
+    def _read_frame_at(self, video_path, cap, frame_number):
+        """
+        Read a frame from the persistent capture
+        
+        Small forward gaps from the current position are skipped with
+        grab(), which does not retrieve the skipped frames; anything else
+        falls back to a seek.
+        
+        Returns:
+            tuple: (ret, frame) as from cap.read()
+        """
+        pos = self._cap_pos.get(video_path, -1)
+        gap = frame_number - pos
+        
+        if pos >= 0 and 0 <= gap <= self.MAX_GRAB_SKIP:
+            for _ in range(gap):
+                if not cap.grab():
+                    self._cap_pos[video_path] = -1
+                    return False, None
+            
+            if cap.grab():
+                ret, frame = cap.retrieve()
+            else:
+                ret, frame = False, None
+        else:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+            ret, frame = cap.read()
+        
+        # Unknown position after a failed read; force a seek next time
+        self._cap_pos[video_path] = frame_number + 1 if ret else -1
+        
+        return ret, frame
+    
+    def resize_image(self, image_path, max_size=(1920, 1080), output_path=None,
+                     backend='pil', filter=None, box_scale=8):
         """
         Resize image while maintaining aspect ratio
         
@@ -202,24 +705,166 @@ class MediaHandler:
             image_path: Path to the image
             max_size: Maximum dimensions (width, height)
             output_path: Path to save resized image (optional)
+            backend: 'pil' or 'cv2' (OpenCV: faster, drops alpha)
+            filter: 'lanczos', 'bicubic', 'bilinear', 'area', ... (defaults
+                    to the handler's resample filter for PIL, 'area' for cv2)
+            box_scale: Without an explicit filter, PIL downscales by more
+                       than this factor use BOX, and by more than half of it
+                       HAMMING, instead of the handler's filter (None: never)
             
         Returns:
-            str or PIL.Image: Path to saved image or Image object
+            str, PIL.Image or numpy.ndarray: Path to saved image, or the
+            resized image (a BGR array with backend='cv2')
         """
         try:
+            if backend == 'cv2':
+                return self._resize_image_cv2(image_path, max_size, output_path, filter or 'area')
+            
             img = Image.open(image_path)
-            img.thumbnail(max_size, Image.Resampling.LANCZOS)
+            
+            # Let libjpeg decode straight at 1/2, 1/4 or 1/8 scale (never
+            # below max_size); thumbnail() alone keeps a 2x margin
+            if img.format == 'JPEG':
+                img.draft('RGB', max_size)
+            
+            resample = filter if filter is not None else self.resample
+            
+            # Large reductions gain nothing from a wide kernel; measured on
+            # the (possibly drafted) image that will actually be resampled
+            if filter is None and box_scale is not None:
+                scale = max(img.width / max_size[0], img.height / max_size[1])
+                if scale > box_scale:
+                    resample = Image.Resampling.BOX
+                elif scale > box_scale / 2:
+                    resample = Image.Resampling.HAMMING
+            
+            if isinstance(resample, str):
+                # PIL's BOX filter is its area average
+                resample = getattr(Image.Resampling, 'BOX' if resample == 'area' else resample.upper())
+            
+            img.thumbnail(max_size, resample)
             
             if output_path:
-                img.save(output_path)
+                is_jpeg = _suffix(output_path) in ('.jpg', '.jpeg')
+                
+                if is_jpeg and _turbojpeg is not None and img.mode == 'RGB':
+                    # Encode the pixel buffer directly with libjpeg-turbo
+                    buf = _turbojpeg.encode(np.asarray(img), quality=OUTPUT_JPEG_QUALITY,
+                                            pixel_format=TJPF_RGB)
+                    with open(output_path, 'wb') as f:
+                        f.write(buf)
+                elif is_jpeg:
+                    # Single Huffman pass, baseline scan
+                    img.save(output_path, quality=OUTPUT_JPEG_QUALITY,
+                             optimize=False, progressive=False)
+                else:
+                    img.save(output_path)
+                
                 return output_path
             
             return img
             
         except Exception as e:
-            print(f"Image resize error: {str(e)}")
+            _log.warning("Image resize error: %s", e)
             return None
     
+    def _resize_image_cv2(self, image_path, max_size, output_path, filter):
+        """OpenCV backend of resize_image (see there)"""
+        # Header-only read of the source size to pick a shrink-on-load factor
+        # that stays at or above max_size (JPEGs decode directly at that scale)
+        with Image.open(image_path) as probe:
+            width, height = probe.size
+        
+        scale = max(width / max_size[0], height / max_size[1])
+        flags = cv2.IMREAD_COLOR
+        for factor, flag in CV2_REDUCED_READ:
+            if scale >= factor:
+                flags = getattr(cv2, flag)
+                break
+        
+        img = cv2.imread(image_path, flags)
+        if img is None:
+            raise ValueError(f"Could not read image: {image_path}")
+        
+        # Same fit as PIL's thumbnail(): keep aspect ratio, never upscale
+        height, width = img.shape[:2]
+        ratio = min(max_size[0] / width, max_size[1] / height)
+        if ratio < 1:
+            size = (max(1, round(width * ratio)), max(1, round(height * ratio)))
+            img = cv2.resize(img, size, interpolation=getattr(cv2, CV2_INTERPOLATION[filter]))
+        
+        if output_path:
+            params = []
+            if _suffix(output_path) in ('.jpg', '.jpeg'):
+                params = [cv2.IMWRITE_JPEG_QUALITY, OUTPUT_JPEG_QUALITY]
+            
+            if not cv2.imwrite(output_path, img, params):
+                raise ValueError(f"Could not write image: {output_path}")
+            return output_path
+        
+        return img
+    
+    def validate_images(self, file_paths, max_workers=None, use_threads=False):
+        """
+        Validate many images in parallel
+        
+        Processes suit CPU-heavy work (full PIL verify() of large files);
+        PIL releases the GIL while decoding, so threads also scale when
+        most files pass the cheap header probe and skip pickling overhead.
+        With processes, callers on Windows/macOS need the usual
+        if __name__ == '__main__' guard.
+        
+        Args:
+            file_paths: Paths to the images
+            max_workers: Pool size (defaults to the CPU count)
+            use_threads: Use a thread pool instead of a process pool
+            
+        Returns:
+            list: validate_image result for each path, in order
+        """
+        file_paths = list(file_paths)
+        
+        if use_threads:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                return list(executor.map(self.validate_image, file_paths))
+        
+        # Workers are fresh handlers, so pass the resolved setting along
+        tasks = [(self._enhanced_validation(None), file_path) for file_path in file_paths]
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(_validate_image_worker, tasks,
+                                     chunksize=_chunksize(len(tasks), max_workers)))
+    
+    def resize_images(self, specs, max_size=(1920, 1080), max_workers=None, use_threads=False):
+        """
+        Resize many images in parallel (see validate_images for the
+        choice between processes and threads)
+        
+        Args:
+            specs: (image_path, output_path) pairs; with output_path None the
+                   resized PIL.Image is returned (pickled back from the worker
+                   when using processes)
+            max_size: Maximum dimensions (width, height)
+            max_workers: Pool size (defaults to the CPU count)
+            use_threads: Use a thread pool instead of a process pool
+            
+        Returns:
+            list: resize_image result for each spec, in order
+        """
+        specs = list(specs)
+        
+        if use_threads:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                return list(executor.map(
+                    lambda spec: self.resize_image(spec[0], max_size, spec[1]), specs))
+        
+        tasks = [(self.resample, image_path, max_size, output_path)
+                 for image_path, output_path in specs]
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(_resize_image_worker, tasks,
+                                     chunksize=_chunksize(len(tasks), max_workers)))
+    
     def get_file_extension(self, file_path):
         """
         Get file extension
@@ -230,4 +875,4 @@ class MediaHandler:
         Returns:
             str: File extension (lowercase)
         """
-        return Path(file_path).suffix.lower()
\ No newline at end of file
+        return _suffix(file_path)
\ No newline at end of file
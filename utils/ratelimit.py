@@ -0,0 +1,55 @@
+"""
+Rate Limiting - Client-side pacing for Gemini API requests
+"""
+import threading
+import time
+
+class TokenBucket:
+    """Thread-safe token bucket that paces requests to a per-minute budget"""
+
+    def __init__(self, rpm, burst=None):
+        """
+        Initialize the bucket
+
+        Args:
+            rpm: Requests allowed per minute (match your Gemini API tier)
+            burst: Maximum requests sent back-to-back (defaults to rpm,
+                   at least 1 so a single request can always be taken)
+        """
+        self.rate = rpm / 60.0
+        self.capacity = max(1, burst if burst is not None else rpm)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        """Add tokens for the time elapsed since the last refill"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens=1):
+        """
+        Block until tokens are available, then take them
+
+        Args:
+            tokens: Number of tokens to take
+        
+        Raises:
+            ValueError: If tokens exceeds the bucket capacity (it would
+                        never fill up enough)
+        """
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot take {tokens} tokens from a bucket of capacity {self.capacity}")
+        
+        while True:
+            with self._lock:
+                self._refill()
+
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+
+                wait = (tokens - self.tokens) / self.rate
+
+            time.sleep(wait)